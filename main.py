@@ -1,26 +1,67 @@
 from pathlib import Path
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, suppress
+from functools import lru_cache
+import asyncio
 import csv
-from typing import List, Tuple, Optional
-
+import hashlib
+import io
+import os
+import re
+import sys
+from typing import Dict, List, Tuple, Optional
+
+# One BLAS/OpenMP thread per process: parallelism comes from uvicorn workers,
+# and unpinned pools oversubscribe the CPU. Must be set before numpy loads.
+for _var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(_var, "1")
+
+import ahocorasick
+import joblib
 import numpy as np
-from fastapi import FastAPI
+import sklearn
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
 from sklearn.svm import LinearSVC
+from sklearn.utils import murmurhash3_32
+from threadpoolctl import threadpool_limits
+
+# safety net in case a BLAS library was already initialised elsewhere
+threadpool_limits(limits=1, user_api="blas")
 
 # -------------------------------------------------
 # FastAPI app + CORS
 # -------------------------------------------------
-app = FastAPI(title="PR Review Reason Classifier")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # dyn_batcher is created further down, once the model is trained
+    await dyn_batcher.start()
+    yield
+    await dyn_batcher.stop()
+
+
+app = FastAPI(title="PR Review Reason Classifier", lifespan=lifespan)
+
+# Comma-separated allowlist, e.g. "https://app.example.com,http://localhost:3000".
+# A set keeps Starlette's per-request origin check O(1); "*" allows any origin.
+ALLOWED_ORIGINS = frozenset(
+    o.strip() for o in os.environ.get("CORS_ALLOWED_ORIGINS", "*").split(",") if o.strip()
+)
+# TODO: restrict in production. With "*" and allow_credentials=True, Starlette
+# echoes back any Origin, so every site can make credentialed requests.
+if "*" in ALLOWED_ORIGINS:
+    print("[WARN] CORS allows any origin with credentials; set CORS_ALLOWED_ORIGINS to restrict it.")
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],   # TODO: restrict in production
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type"],
 )
 
 # -------------------------------------------------
@@ -48,6 +89,8 @@ ALL_LABELS = [
     LABEL_OTHER,
 ]
 
+N_LABELS = len(ALL_LABELS)
+
 # -------------------------------------------------
 # Human-readable explanations per label
 # -------------------------------------------------
@@ -108,8 +151,9 @@ def make_keywords(*terms: str) -> List[str]:
     """
     Build a sorted, unique, lower-cased list of keywords.
     This automatically removes duplicates and keeps the lists clean.
+    Keywords are interned so labels sharing a phrase share one string.
     """
-    uniq = {t.strip().lower() for t in terms if t and t.strip()}
+    uniq = {sys.intern(t.strip().lower()) for t in terms if t and t.strip()}
     return sorted(uniq)
 
 
@@ -420,6 +464,64 @@ KEYWORDS = {
 }
 
 
+# -------------------------------------------------
+# Keywords by label index (position in ALL_LABELS)
+# -------------------------------------------------
+KEYWORDS_BY_IDX: List[Tuple[str, ...]] = [tuple(KEYWORDS.get(label, [])) for label in ALL_LABELS]
+
+
+def build_keyword_to_labels() -> Dict[str, Tuple[int, ...]]:
+    """
+    Map each unique keyword to the indices (in ALL_LABELS) of the labels
+    that list it, so a single scan can credit every label at once.
+    """
+    keyword_labels: Dict[str, List[int]] = {}
+    for label_idx, kws in enumerate(KEYWORDS_BY_IDX):
+        for kw in kws:
+            keyword_labels.setdefault(kw, []).append(label_idx)
+    return {kw: tuple(idxs) for kw, idxs in keyword_labels.items()}
+
+
+KEYWORD_TO_LABELS = build_keyword_to_labels()
+
+
+def build_keyword_label_matrix() -> np.ndarray:
+    """
+    Indicator matrix W (n_keywords × N_LABELS): W[k, l] = 1 if keyword k
+    (in KEYWORD_TO_LABELS order) belongs to label l. Summing the rows of the
+    matched keywords gives the per-label hit counts in one numpy call.
+    """
+    matrix = np.zeros((len(KEYWORD_TO_LABELS), N_LABELS), dtype=np.int32)
+    for kw_idx, label_idxs in enumerate(KEYWORD_TO_LABELS.values()):
+        matrix[kw_idx, list(label_idxs)] = 1
+    return matrix
+
+
+KEYWORD_LABEL_MATRIX = build_keyword_label_matrix()
+
+
+# -------------------------------------------------
+# Single Aho-Corasick automaton over all keywords
+# -------------------------------------------------
+def build_keyword_automaton() -> ahocorasick.Automaton:
+    """
+    Flatten KEYWORD_TO_LABELS into one automaton so that a single linear
+    pass over the text reports every keyword hit for every label at once.
+    Each keyword carries its row index in KEYWORD_LABEL_MATRIX.
+    """
+    automaton = ahocorasick.Automaton()
+    for kw_idx, kw in enumerate(KEYWORD_TO_LABELS):
+        automaton.add_word(kw, kw_idx)
+    automaton.make_automaton()
+    return automaton
+
+
+KEYWORD_AUTOMATON = build_keyword_automaton()
+
+# texts shorter than the shortest keyword cannot match anything
+MIN_KEYWORD_LEN = min(map(len, KEYWORD_TO_LABELS))
+
+
 def rule_based_label(text: str) -> Optional[str]:
     """
     Try to infer the label using simple keyword matching based on the
@@ -427,33 +529,66 @@ def rule_based_label(text: str) -> Optional[str]:
     Returns a label or None if there is no strong signal.
     """
     t = text.casefold()  # more robust than lower()
-    words = t.split()
-    scores = {}
-
-    for label, kws in KEYWORDS.items():
-        if not kws:
-            continue
-        count = sum(1 for kw in kws if kw in t)
-        if count > 0:
-            scores[label] = count
+    if len(t) < MIN_KEYWORD_LEN:
+        return None
 
-    if not scores:
+    # each keyword counts once per label, however often it occurs
+    matched = {kw_idx for _, kw_idx in KEYWORD_AUTOMATON.iter(t)}
+    if not matched:
         return None
 
-    best_label = max(scores, key=scores.get)
-    max_hits = scores[best_label]
+    counts = KEYWORD_LABEL_MATRIX[list(matched)].sum(axis=0)
+
+    # argmax → ties go to the label listed first in ALL_LABELS
+    best_idx = int(counts.argmax())
+    max_hits = int(counts[best_idx])
 
     # at least 2 hits → strong signal
     if max_hits >= 2:
-        return best_label
+        return ALL_LABELS[best_idx]
 
-    # short text with a single strong keyword
-    if max_hits == 1 and len(words) <= 8:
-        return best_label
+    # short text with a single strong keyword (split stops after 9 words)
+    if max_hits == 1 and len(t.split(maxsplit=8)) <= 8:
+        return ALL_LABELS[best_idx]
 
     return None
 
 
+def rule_based_label_batch(texts: List[str]) -> List[Optional[str]]:
+    """
+    rule_based_label over many texts at once (e.g. a whole CSV corpus).
+    Each text still gets one automaton pass, but the per-label counting,
+    argmax and thresholds run once for the whole batch in numpy.
+    """
+    n = len(texts)
+    hit_rows: List[int] = []
+    hit_keywords: List[int] = []
+
+    for i, text in enumerate(texts):
+        t = text.casefold()
+        if len(t) < MIN_KEYWORD_LEN:
+            continue
+        matched = {kw_idx for _, kw_idx in KEYWORD_AUTOMATON.iter(t)}
+        if not matched:
+            continue
+        hit_rows.extend([i] * len(matched))
+        hit_keywords.extend(matched)
+
+    counts = np.zeros((n, N_LABELS), dtype=np.int32)
+    np.add.at(counts, hit_rows, KEYWORD_LABEL_MATRIX[hit_keywords])
+
+    best_idx = counts.argmax(axis=1)
+    max_hits = counts[np.arange(n), best_idx]
+
+    # same thresholds as rule_based_label; words are only counted for the
+    # single-hit texts that need it (casefold never adds or removes spaces)
+    confident = max_hits >= 2
+    for i in np.flatnonzero(max_hits == 1).tolist():
+        confident[i] = len(texts[i].split(maxsplit=8)) <= 8
+
+    return [ALL_LABELS[b] if ok else None for b, ok in zip(best_idx.tolist(), confident.tolist())]
+
+
 # -------------------------------------------------
 # 1) Small hand-written seed examples
 # -------------------------------------------------
@@ -545,12 +680,8 @@ SEED_LABEL_TEXTS = {
 
 
 def seed_examples_from_dict() -> Tuple[List[str], List[str]]:
-    texts: List[str] = []
-    labels: List[str] = []
-    for label, examples in SEED_LABEL_TEXTS.items():
-        for txt in examples:
-            texts.append(txt)
-            labels.append(label)
+    texts = [txt for examples in SEED_LABEL_TEXTS.values() for txt in examples]
+    labels = [label for label, examples in SEED_LABEL_TEXTS.items() for _ in examples]
     return texts, labels
 
 
@@ -566,9 +697,39 @@ DATASET_FILES = [
 def clean_text(text: str) -> str:
     if text is None:
         return ""
-    return " ".join(text.replace("\n", " ").replace("\r", " ").split())
+    # split() already treats \n and \r as whitespace, so no replace() passes
+    return " ".join(text.split())
+
+
+# One regex for all category rules. Alternatives are tried in order at the
+# start of the string, so the first rule that matches wins: a plain word is
+# a "starts with" check, ".*?phrase" is a "contains" check.
+CATEGORY_RE = re.compile(
+    r"(?P<spec>specification|.*?intent mismatch)"
+    r"|(?P<logic>logic|.*?semantic)"
+    r"|(?P<build>build|.*?ci/environment|.*?environment failure)"
+    r"|(?P<style>style|.*?convention violation)"
+    r"|(?P<testing>testing|.*?testing inadequacy|.*?missing, weak, or incorrect tests)"
+    r"|(?P<design>architectural|.*?design misfit)"
+    r"|(?P<process>process|policy)"
+    r"|(?P<tooling>tool-use|tool use|.*?automation error)",
+    re.DOTALL,
+)
+
+CATEGORY_GROUP_TO_LABEL = {
+    "spec": LABEL_SPEC_INTENT,
+    "logic": LABEL_LOGIC,
+    "build": LABEL_BUILD_CI,
+    "style": LABEL_STYLE,
+    "testing": LABEL_TESTING,
+    "design": LABEL_DESIGN,
+    "process": LABEL_PROCESS,
+    "tooling": LABEL_TOOLING,
+}
 
 
+# category cells repeat across rows, so each distinct string is parsed once
+@lru_cache(maxsize=1024)
 def normalize_category(raw: str) -> Optional[str]:
     if not raw:
         return None
@@ -582,91 +743,91 @@ def normalize_category(raw: str) -> Optional[str]:
 
     core_lower = c_core.lower()
 
-    if core_lower.startswith("specification") or "intent mismatch" in core_lower:
-        return LABEL_SPEC_INTENT
-
-    if core_lower.startswith("logic") or "semantic" in core_lower:
-        return LABEL_LOGIC
+    m = CATEGORY_RE.match(core_lower)
+    return CATEGORY_GROUP_TO_LABEL[m.lastgroup] if m else LABEL_OTHER
 
-    if core_lower.startswith("build") or "ci/environment" in core_lower or "environment failure" in core_lower:
-        return LABEL_BUILD_CI
 
-    if core_lower.startswith("style") or "convention violation" in core_lower:
-        return LABEL_STYLE
+# candidate column names, in order of preference
+TEXT_COLUMNS = ("body_comment", "comment_body", "body", "text")
+CATEGORY_COLUMNS = ("Category", "category", "label")
 
-    if (
-        core_lower.startswith("testing")
-        or "testing inadequacy" in core_lower
-        or "missing, weak, or incorrect tests" in core_lower
-    ):
-        return LABEL_TESTING
 
-    if core_lower.startswith("architectural") or "design misfit" in core_lower:
-        return LABEL_DESIGN
+def first_non_empty(row: List[str], cols: List[int]) -> str:
+    for i in cols:
+        if i < len(row) and row[i]:
+            return row[i]
+    return ""
 
-    if core_lower.startswith("process") or core_lower.startswith("policy"):
-        return LABEL_PROCESS
 
-    if core_lower.startswith("tool-use") or core_lower.startswith("tool use") or "automation error" in core_lower:
-        return LABEL_TOOLING
+# tried in order; latin-1 accepts any byte sequence, so it always succeeds
+CSV_ENCODINGS = ("utf-8-sig", "cp1256", "latin-1")
 
-    if core_lower.startswith("other"):
-        return LABEL_OTHER
 
-    return LABEL_OTHER
+def read_csv_text(path: Path) -> Tuple[str, str]:
+    """
+    Read a CSV file once and decode it with the first encoding in
+    CSV_ENCODINGS that fits, so a non-UTF-8 file is parsed only once.
+    """
+    data = path.read_bytes()
+    for enc in CSV_ENCODINGS[:-1]:
+        try:
+            return data.decode(enc), enc
+        except UnicodeDecodeError:
+            continue
+    return data.decode(CSV_ENCODINGS[-1]), CSV_ENCODINGS[-1]
 
 
-def load_csv_examples() -> Tuple[List[str], List[str]]:
-    base_dir = Path(__file__).resolve().parent
+def load_csv_file(path: Path) -> Tuple[List[str], List[str]]:
     texts: List[str] = []
     labels: List[str] = []
 
-    encodings_to_try = ["utf-8-sig", "utf-8", "cp1256", "latin-1"]
+    try:
+        content, enc = read_csv_text(path)
+        reader = csv.reader(io.StringIO(content, newline=""))
+        header = next(reader, [])
+        # resolve column positions once instead of building a dict per row
+        text_cols = [header.index(c) for c in TEXT_COLUMNS if c in header]
+        cat_cols = [header.index(c) for c in CATEGORY_COLUMNS if c in header]
 
-    for fname in DATASET_FILES:
-        path = base_dir / fname
-        if not path.exists():
-            continue
+        for row in reader:
+            raw_text = first_non_empty(row, text_cols)
+            raw_cat = first_non_empty(row, cat_cols)
 
-        loaded_this_file = 0
+            text = clean_text(raw_text or "")
+            if not text:
+                continue
 
-        for enc in encodings_to_try:
-            try:
-                with path.open("r", encoding=enc, newline="") as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        raw_text = (
-                            row.get("body_comment")
-                            or row.get("comment_body")
-                            or row.get("body")
-                            or row.get("text")
-                        )
-                        raw_cat = row.get("Category") or row.get("category") or row.get("label")
-
-                        text = clean_text(raw_text or "")
-                        if not text:
-                            continue
-
-                        label = normalize_category(raw_cat or "")
-                        if label is None:
-                            continue
-
-                        texts.append(text)
-                        labels.append(label)
-                        loaded_this_file += 1
-
-                print(f"[INFO] Loaded {loaded_this_file} rows from {path.name} using encoding '{enc}'.")
-                break
-
-            except UnicodeDecodeError:
-                # try next encoding
+            label = normalize_category(raw_cat or "")
+            if label is None:
                 continue
-            except Exception as e:
-                print(f"[WARN] Failed to load {path.name} with encoding {enc}: {e}")
-                break
 
-        if loaded_this_file == 0:
-            print(f"[WARN] Could not read any rows from {path.name} with encodings {encodings_to_try}.")
+            texts.append(text)
+            labels.append(label)
+
+        print(f"[INFO] Loaded {len(texts)} rows from {path.name} using encoding '{enc}'.")
+
+    except Exception as e:
+        print(f"[WARN] Failed to load {path.name}: {e}")
+
+    if not texts:
+        print(f"[WARN] Could not read any rows from {path.name} with encodings {list(CSV_ENCODINGS)}.")
+
+    return texts, labels
+
+
+def load_csv_examples() -> Tuple[List[str], List[str]]:
+    base_dir = Path(__file__).resolve().parent
+    texts: List[str] = []
+    labels: List[str] = []
+
+    paths = [base_dir / fname for fname in DATASET_FILES]
+    paths = [path for path in paths if path.exists()]
+
+    # one thread per file overlaps the disk reads; map() keeps DATASET_FILES order
+    with ThreadPoolExecutor(max_workers=max(1, len(paths))) as executor:
+        for file_texts, file_labels in executor.map(load_csv_file, paths):
+            texts.extend(file_texts)
+            labels.extend(file_labels)
 
     print(f"[INFO] Loaded {len(texts)} labeled rows from CSV files in total.")
     return texts, labels
@@ -675,33 +836,372 @@ def load_csv_examples() -> Tuple[List[str], List[str]]:
 # -------------------------------------------------
 # 3) Train model (seed + CSV)
 # -------------------------------------------------
-seed_texts, seed_labels = seed_examples_from_dict()
-csv_texts, csv_labels = load_csv_examples()
+def build_hashing() -> HashingVectorizer:
+    # Unlike a vocabulary, hashing lets distinct n-grams share a bucket. A
+    # trained n-gram can absorb another's weight, and an n-gram never seen
+    # in training can land in a trained bucket and move the score. 2**24
+    # buckets keep that rare for the ~1e5 n-grams of a large CSV corpus;
+    # only the buckets seen in training are ever stored (see train_model).
+    return HashingVectorizer(
+        lowercase=True,
+        ngram_range=(1, 3),
+        n_features=2**24,
+        alternate_sign=False,
+        norm=None,
+        dtype=np.float32,
+    )
+
+
+def build_classifier() -> LinearSVC:
+    return LinearSVC()
+
+
+def train_model() -> Tuple[HashingVectorizer, np.ndarray, np.ndarray, LinearSVC]:
+    """
+    Fit the featurizer and the SVM on the seed examples plus any CSV rows.
+    Returns (hashing, features, feature_idf, clf): the sorted hashed feature
+    ids seen in training, their idf, and the SVM fit on just those columns.
+    """
+    # CSV rows are appended to the seed lists in place, no concatenated copy
+    train_texts, train_labels = seed_examples_from_dict()
+    csv_texts, csv_labels = load_csv_examples()
+    train_texts.extend(csv_texts)
+    train_labels.extend(csv_labels)
+    del csv_texts, csv_labels
+
+    if not train_texts:
+        raise RuntimeError("No training data found. Please add at least some seed examples or CSV rows.")
+
+    # Templated comments repeat a lot: each distinct (text, label) row is
+    # hashed and fit once, weighted by how often it occurs.
+    row_counts = Counter(zip(train_texts, train_labels))
+    uniq_texts = [text for text, _ in row_counts]
+    uniq_labels = [label for _, label in row_counts]
+    row_weights = np.fromiter(row_counts.values(), dtype=np.int64, count=len(row_counts))
+    del train_texts, train_labels
+
+    print(f"[INFO] Total training examples: {int(row_weights.sum())} ({len(uniq_texts)} distinct)")
+
+    # Stateless hashing featurizer (no vocabulary dict) + fitted IDF weights.
+    hashing = build_hashing()
+    tfidf = TfidfTransformer(sublinear_tf=True)
+
+    # Hashed n-grams never seen in training are dropped, just like
+    # out-of-vocabulary terms in TfidfVectorizer, so they don't dilute the L2
+    # norm of new comments. Every other column would get exactly zero weight,
+    # so the SVM is fit on the seen columns only.
+    train_counts = hashing.transform(uniq_texts)
+    features = np.unique(train_counts.indices).astype(np.int32)
+    train_counts = train_counts[:, features]
+
+    # document frequencies count every duplicate, as if rows were not merged;
+    # idf is TfidfTransformer's smooth formula ln((1 + n) / (1 + df)) + 1
+    n_docs = int(row_weights.sum())
+    df = np.asarray(row_weights @ (train_counts > 0)).ravel()
+    tfidf.idf_ = np.log((1 + n_docs) / (1 + df)) + 1.0
+    X_train = tfidf.transform(train_counts)
+
+    # a sample weight of k is the same hinge-loss term as k identical rows
+    clf = build_classifier()
+    clf.fit(X_train, uniq_labels, sample_weight=row_weights.astype(np.float64))
+
+    # a float32 intercept keeps svm_scores in single precision end to end
+    clf.intercept_ = clf.intercept_.astype(np.float32)
+    return hashing, features, tfidf.idf_.astype(np.float32), clf
+
+
+def quantize_coef(coef: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-class int8 quantization of the SVM weights (max-abs scaling).
+    Returns (coef_i8, scales) with coef ≈ coef_i8 * scales[:, None].
+    """
+    scales = np.abs(coef).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    coef_i8 = np.round(coef / scales[:, None]).astype(np.int8)
+    return coef_i8, scales.astype(np.float32)
+
 
-train_texts: List[str] = seed_texts + csv_texts
-train_labels: List[str] = seed_labels + csv_labels
+def compact_model(coef: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    int8 weights of the SVM fit on the seen features, laid out
+    features × classes so the weights of one feature are adjacent in memory.
+    Returns (coef_i8, scales).
+    """
+    coef_i8, scales = quantize_coef(coef)
+    return np.ascontiguousarray(coef_i8.T), scales
 
-if not train_texts:
-    raise RuntimeError("No training data found. Please add at least some seed examples or CSV rows.")
 
-print(f"[INFO] Total training examples: {len(train_texts)}")
+# bump when the layout of the cached model changes
+MODEL_FORMAT = 4
 
-vectorizer = TfidfVectorizer(
-    lowercase=True,
-    ngram_range=(1, 3),
-    min_df=1,
-    sublinear_tf=True,
-)
 
-X_train = vectorizer.fit_transform(train_texts)
+def model_cache_key() -> str:
+    """
+    Hash of everything the fitted model depends on: the seed examples, the
+    CSV datasets (name, mtime, size), the featurizer and SVM hyperparameters
+    and the sklearn/numpy versions.
+    """
+    base_dir = Path(__file__).resolve().parent
+    h = hashlib.sha256(repr(SEED_LABEL_TEXTS).encode("utf-8"))
+    for fname in DATASET_FILES:
+        path = base_dir / fname
+        if path.exists():
+            st = path.stat()
+            h.update(f"|{fname}:{st.st_mtime_ns}:{st.st_size}".encode("utf-8"))
+    h.update(f"|hashing={build_hashing().get_params()!r}".encode("utf-8"))
+    h.update(f"|svm={build_classifier().get_params()!r}".encode("utf-8"))
+    h.update(f"|sklearn={sklearn.__version__}|numpy={np.__version__}".encode("utf-8"))
+    h.update(f"|format={MODEL_FORMAT}".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def load_model_file(path: Path) -> dict:
+    """
+    Memory-map a saved model, checking that it has the current MODEL_FORMAT.
+    """
+    model = joblib.load(path, mmap_mode="r")
+    found = model.get("format") if isinstance(model, dict) else None
+    if found != MODEL_FORMAT:
+        raise ValueError(f"model format is {found}, expected {MODEL_FORMAT}; retrain it with `python main.py`")
+    return model
+
+
+def load_cached_model(path: Path):
+    """
+    Memory-map a cached model, or return None if it's missing or unreadable.
+    """
+    if not path.exists():
+        return None
+    try:
+        return load_model_file(path)
+    except Exception as e:
+        print(f"[WARN] Failed to load cached model {path.name}: {e}")
+        return None
+
 
-clf = LinearSVC()
-clf.fit(X_train, train_labels)
+# The fitted model is cached on disk and memory-mapped on later startups, so
+# uvicorn workers share one read-only copy of the compacted SVM arrays.
+# The file name carries a hash of the training inputs, so editing the seeds
+# or CSV datasets (or upgrading sklearn) retrains automatically.
+#
+# To train offline, run `python main.py` (it prints the model file) and ship
+# that file without the CSVs: with PR_CLASSIFIER_MODEL_FILE pointing at it,
+# startup only loads it and never trains.
+PRETRAINED_MODEL_FILE = os.environ.get("PR_CLASSIFIER_MODEL_FILE")
+
+if PRETRAINED_MODEL_FILE:
+    MODEL_FILE = Path(PRETRAINED_MODEL_FILE).resolve()
+    try:
+        cached_model = load_model_file(MODEL_FILE)
+    except Exception as e:  # missing, truncated, unpicklable or wrong format
+        raise RuntimeError(f"Cannot use PR_CLASSIFIER_MODEL_FILE {MODEL_FILE}: {e}") from e
+else:
+    MODEL_FILE = Path(__file__).resolve().parent / f"svm_model.{model_cache_key()}.joblib"
+    cached_model = load_cached_model(MODEL_FILE)
+
+if cached_model is not None:
+    HASHING = cached_model["hashing"]
+    svm_classes = cached_model["classes"]
+    svm_intercept = cached_model["intercept"]
+    model_features = cached_model["model_features"]
+    feature_idf = cached_model["feature_idf"]
+    coef_i8 = cached_model["coef_i8"]
+    coef_scales = cached_model["coef_scales"]
+    print(f"[INFO] Loaded cached model from {MODEL_FILE.name}.")
+else:
+    HASHING, model_features, feature_idf, clf = train_model()
+    # only what svm_scores needs is kept, never the fitted LinearSVC
+    svm_classes = clf.classes_
+    svm_intercept = clf.intercept_
+    coef_i8, coef_scales = compact_model(clf.coef_)
+    del clf
+    # write-then-rename so concurrently starting workers never see a partial file
+    tmp_file = MODEL_FILE.with_name(f"{MODEL_FILE.name}.{os.getpid()}.tmp")
+    try:
+        joblib.dump(
+            {
+                "format": MODEL_FORMAT,
+                "hashing": HASHING,
+                "classes": svm_classes,
+                "intercept": svm_intercept,
+                "model_features": model_features,
+                "feature_idf": feature_idf,
+                "coef_i8": coef_i8,
+                "coef_scales": coef_scales,
+            },
+            tmp_file,
+        )
+        os.replace(tmp_file, MODEL_FILE)
+        print(f"[INFO] Saved trained model to {MODEL_FILE.name}.")
+    except OSError as e:
+        print(f"[WARN] Could not cache trained model: {e}")
+        with suppress(OSError):
+            tmp_file.unlink()
+    else:
+        # models trained for older inputs are never loaded again; processes
+        # still mapping one keep their pages until they exit
+        for old_file in MODEL_FILE.parent.glob("svm_model.*.joblib"):
+            if old_file != MODEL_FILE:
+                with suppress(OSError):
+                    old_file.unlink()
+del cached_model
 
 # if SVM is too unsure, fallback to OTHER
 CONFIDENCE_MARGIN = 0.25
 
 
+# The TfidfTransformer is not run at predict time: sublinear tf, idf weighting
+# and the L2 norm are applied straight to the hashed counts in svm_scores.
+ANALYZER = HASHING.build_analyzer()
+# past ~500 chars the Python hashing loop is no faster than FeatureHasher
+DIRECT_HASH_MAX_LEN = 500
+
+
+def hashed_counts(texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Hashed n-gram counts of the texts as CSR (data, indices, indptr) arrays.
+    A single short text (the usual /classify case) is hashed directly: for it,
+    building and validating a scipy matrix costs more than the hashing, and
+    murmurhash3_32 + abs() % n_features is the same mapping FeatureHasher uses.
+    """
+    if len(texts) != 1 or len(texts[0]) > DIRECT_HASH_MAX_LEN:
+        X = HASHING.transform(texts)
+        return X.data, X.indices, X.indptr
+
+    counts: Dict[int, int] = {}
+    for token in ANALYZER(texts[0]):
+        idx = abs(murmurhash3_32(token, seed=0)) % HASHING.n_features
+        counts[idx] = counts.get(idx, 0) + 1
+    data = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    indices = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+    # sorted like FeatureHasher output, so scores sum in the same order
+    order = np.argsort(indices)
+    return data[order], indices[order], np.array([0, len(counts)])
+
+
+def direct_hashing_matches(texts: List[str]) -> bool:
+    """
+    True if the direct path in hashed_counts gives the same CSR arrays as
+    HASHING.transform. It mirrors FeatureHasher internals, which a future
+    sklearn release could change.
+    """
+    for text in texts:
+        X = HASHING.transform([text])
+        data, indices, indptr = hashed_counts([text])
+        if not (
+            np.array_equal(data, X.data) and np.array_equal(indices, X.indices) and np.array_equal(indptr, X.indptr)
+        ):
+            return False
+    return True
+
+
+HASH_CHECK_TEXTS = ["please add tests for this", "Off-by-one in the parser!", "ça ne compile pas", "lgtm lgtm lgtm"]
+
+if not direct_hashing_matches(HASH_CHECK_TEXTS):
+    print("[WARN] Direct n-gram hashing disagrees with HashingVectorizer; using HashingVectorizer only.")
+    DIRECT_HASH_MAX_LEN = -1
+
+
+def svm_scores(texts: List[str]) -> np.ndarray:
+    """
+    Score a batch of cleaned texts in one pass over the hashed counts against
+    the int8-quantized SVM weights (same ranking as LinearSVC.decision_function).
+    Returns an (n_texts, n_classes) float32 array aligned with svm_classes.
+    """
+    data, indices, indptr = hashed_counts(texts)
+    scores = np.zeros((len(texts), coef_i8.shape[1]), dtype=np.float32)
+
+    # map hashed feature ids to model rows and drop the ones never seen in
+    # training; rows left with no features score just the intercept
+    pos = np.searchsorted(model_features, indices)
+    np.minimum(pos, model_features.size - 1, out=pos)
+    seen = model_features[pos] == indices
+    indptr = np.concatenate(([0], np.cumsum(seen)))[indptr]
+    pos = pos[seen]
+
+    rows = np.flatnonzero(np.diff(indptr))
+    if rows.size:
+        # tf-idf weights of the remaining features
+        w = data[seen]
+        np.log(w, out=w)
+        w += 1.0
+        w *= feature_idf[pos]
+
+        starts = indptr[rows]
+        raw = np.add.reduceat(coef_i8[pos] * w[:, None], starts, axis=0)
+        raw /= np.sqrt(np.add.reduceat(w * w, starts))[:, None]
+        scores[rows] = raw
+
+    scores *= coef_scales
+    scores += svm_intercept
+    return scores
+
+
+# -------------------------------------------------
+# Dynamic request batching for the SVM step
+# -------------------------------------------------
+class DynBatcher:
+    """
+    Coalesce concurrent /classify requests into a single svm_scores() call.
+    The worker never waits for company: it takes whatever is queued (up to
+    `max_batch_size` texts), scores it at once and hands each row back to
+    the coroutine that asked for it. Requests arriving while a batch is
+    being scored pile up and form the next batch, so an idle server answers
+    at once and a busy one batches by itself.
+    """
+
+    def __init__(self, max_batch_size: int = 32):
+        self.max_batch_size = max_batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._worker
+        self._worker = None
+        self._queue = None
+
+    async def process_batched(self, text: str) -> np.ndarray:
+        if self._queue is None:
+            # no lifespan ran (e.g. a mounted sub-app): score this text alone
+            return (await asyncio.to_thread(svm_scores, [text]))[0]
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            texts = [text for text, _ in batch]
+            try:
+                # sklearn work runs off the event loop so it keeps accepting requests
+                scores = await asyncio.to_thread(svm_scores, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), row in zip(batch, scores):
+                if not future.done():
+                    future.set_result(row)
+
+
+dyn_batcher = DynBatcher(max_batch_size=32)
+
+
 # -------------------------------------------------
 # Schemas
 # -------------------------------------------------
@@ -709,62 +1209,260 @@ class TextInput(BaseModel):
     text: str
 
 
+class BatchInput(BaseModel):
+    texts: List[str]
+
+
 class ClassificationResult(BaseModel):
+    # frozen: cached instances are shared between responses
+    model_config = ConfigDict(frozen=True)
+
     predicted_label: Optional[str]
     margin: float
     best_score: float
 
 
+class ServiceInfo(BaseModel):
+    message: str
+    labels: List[str]
+    label_explanations: Dict[str, str]
+
+
+# -------------------------------------------------
+# LRU cache of results, keyed by a digest of the cleaned text
+# -------------------------------------------------
+class ResultCache:
+    """
+    Bounded LRU mapping text digests to the JSON-encoded ClassificationResult.
+    Templated comments ("lgtm", "please run prettier", ...) repeat a lot,
+    so their rule scan, SVM scoring and serialization is done once. Keys are 16-byte
+    blake2b digests, so long comments are not kept in memory.
+    Only touched from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, maxsize: int = 16384):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[bytes, bytes]" = OrderedDict()
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        # The featurizer lowercases and the rules casefold, so "LGTM" and
+        # "lgtm" always get the same result and can share an entry.
+        return hashlib.blake2b(text.lower().encode("utf-8"), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        body = self._data.get(key)
+        if body is not None:
+            self._data.move_to_end(key)
+        return body
+
+    def put(self, key: bytes, body: bytes) -> None:
+        self._data[key] = body
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+result_cache = ResultCache(maxsize=16384)
+
+# Long comments almost never repeat verbatim; caching them would only evict
+# the short templated ones that do. Applies to the cleaned text.
+CACHE_MAX_TEXT_LEN = 2000
+
+# Raw inputs this long are cleaned and classified in a worker thread: that
+# work is linear in the text length and would otherwise stall the event loop.
+OFFLOAD_MIN_RAW_LEN = 2000
+
+
 # -------------------------------------------------
 # Endpoints
 # -------------------------------------------------
-@app.get("/")
+# Endpoints return pre-encoded JSON bodies in a plain Response, so FastAPI
+# skips re-validating and re-serializing the response model on every call.
+# response_model is kept for the OpenAPI schema.
+def json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
+def encode_result(result: ClassificationResult) -> bytes:
+    return result.model_dump_json().encode("utf-8")
+
+
+# The metadata never changes, so its JSON body is encoded once at import.
+ROOT_RESPONSE_BODY = ServiceInfo(
+    message="PR Review Reason Classifier is running 🚀",
+    labels=ALL_LABELS,
+    label_explanations=LABEL_EXPLANATIONS,
+).model_dump_json().encode("utf-8")
+
+EMPTY_TEXT_BODY = encode_result(ClassificationResult(predicted_label=None, margin=0.0, best_score=0.0))
+
+
+@app.get("/", response_model=ServiceInfo)
 def root():
     """
     Simple health-check + metadata.
     Now also returns label explanations so the frontend
     can show tooltips or documentation for each category.
     """
-    return {
-        "message": "PR Review Reason Classifier is running 🚀",
-        "labels": ALL_LABELS,
-        "label_explanations": LABEL_EXPLANATIONS,
-    }
+    return json_response(ROOT_RESPONSE_BODY)
 
 
 @app.post("/classify", response_model=ClassificationResult)
-def classify(input: TextInput):
+async def classify(input: TextInput):
     """
     1) Rule-based using taxonomy keywords and explanations.
-    2) If no strong rule hit → SVM.
+    2) If no strong rule hit → SVM (batched with concurrent requests).
     3) If SVM margin small → 'Other'.
     """
-    text = clean_text(input.text or "")
+    raw = input.text or ""
+    offload = len(raw) >= OFFLOAD_MIN_RAW_LEN
+    text = await asyncio.to_thread(clean_text, raw) if offload else clean_text(raw)
     if not text:
-        return ClassificationResult(predicted_label=None, margin=0.0, best_score=0.0)
+        return json_response(EMPTY_TEXT_BODY)
+
+    cacheable = len(text) < CACHE_MAX_TEXT_LEN
+    if cacheable:
+        key = ResultCache.key(text)
+        body = result_cache.get(key)
+        if body is not None:
+            return json_response(body)
+
+    if offload:
+        result = (await asyncio.to_thread(classify_many, [text]))[0]
+    else:
+        result = await classify_text(text)
+    body = encode_result(result)
+    if cacheable:
+        result_cache.put(key, body)
+    return json_response(body)
+
+
+@app.post("/classify_batch", response_model=List[ClassificationResult])
+async def classify_batch(input: BatchInput):
+    """
+    Same as /classify for many texts at once; results keep the input order.
+    Uncached texts go through one rule pass and one svm_scores() call
+    for the whole batch instead of one per text.
+    """
+    # cleaning and hashing scale with the request size, so they run off the loop
+    texts, keys = await asyncio.to_thread(prepare_batch, input.texts)
+    bodies: List[Optional[bytes]] = [None] * len(texts)
+
+    # positions of each distinct uncached text, by cache key
+    pending: Dict[bytes, List[int]] = {}
+    for i, (text, key) in enumerate(zip(texts, keys)):
+        if not text:
+            bodies[i] = EMPTY_TEXT_BODY
+            continue
+        cached = result_cache.get(key)
+        if cached is not None:
+            bodies[i] = cached
+        else:
+            pending.setdefault(key, []).append(i)
+
+    if pending:
+        keys = list(pending)
+        pending_texts = [texts[pending[key][0]] for key in keys]
+        new_results = await asyncio.to_thread(classify_many, pending_texts)
+
+        for key, text, result in zip(keys, pending_texts, new_results):
+            body = encode_result(result)
+            if len(text) < CACHE_MAX_TEXT_LEN:
+                result_cache.put(key, body)
+            for i in pending[key]:
+                bodies[i] = body
 
+    return json_response(b"[" + b",".join(bodies) + b"]")
+
+
+def prepare_batch(raw_texts: List[str]) -> Tuple[List[str], List[bytes]]:
+    """
+    Cleaned texts and their cache keys (b"" for empty texts).
+    """
+    texts = [clean_text(t or "") for t in raw_texts]
+    return texts, [ResultCache.key(text) if text else b"" for text in texts]
+
+
+def top_two(scores: np.ndarray) -> Tuple[int, float, float]:
+    """
+    (argmax, best score, second-best score) in one pass over the class scores.
+    A plain loop beats argmax + sort for a handful of classes.
+    """
+    values = scores.tolist()
+    best_idx = 0
+    best_score = values[0]
+    second_best = float("-inf") if len(values) > 1 else 0.0
+    for i in range(1, len(values)):
+        v = values[i]
+        if v > best_score:
+            best_idx, best_score, second_best = i, v, best_score
+        elif v > second_best:
+            second_best = v
+    return best_idx, best_score, second_best
+
+
+async def classify_text(text: str) -> ClassificationResult:
+    """
+    Classify one non-empty cleaned text (uncached).
+    """
     # Step 1: rule-based
     rb_label = rule_based_label(text)
     if rb_label is not None:
-        # We use (margin=1, best_score=1) as a clear signal in the UI
-        # that this came from the taxonomy rules, not SVM.
-        return ClassificationResult(predicted_label=rb_label, margin=1.0, best_score=1.0)
+        return rule_result(rb_label)
 
     # Step 2: SVM
-    X = vectorizer.transform([text])
-    scores = clf.decision_function(X)[0]
-    classes = clf.classes_
+    if TOKEN_RE.search(text.lower()) is None:
+        # no tokens means an all-zero feature row: the scores are just the intercept
+        return NO_TOKENS_RESULT
+    scores = await dyn_batcher.process_batched(text)
+    return svm_result(scores)
+
+
+def rule_result(label: str) -> ClassificationResult:
+    # We use (margin=1, best_score=1) as a clear signal in the UI
+    # that this came from the taxonomy rules, not SVM.
+    return ClassificationResult(predicted_label=label, margin=1.0, best_score=1.0)
 
-    best_idx = int(np.argmax(scores))
-    best_score = float(scores[best_idx])
 
-    sorted_scores = np.sort(scores)
-    second_best = float(sorted_scores[-2]) if len(sorted_scores) > 1 else 0.0
+def svm_result(scores: np.ndarray) -> ClassificationResult:
+    """
+    Turn one row of SVM scores into a result (Step 3: small margin → 'Other').
+    """
+    best_idx, best_score, second_best = top_two(scores)
     margin = best_score - second_best
 
     if margin < CONFIDENCE_MARGIN:
         predicted = LABEL_OTHER
     else:
-        predicted = str(classes[best_idx])
+        predicted = str(svm_classes[best_idx])
 
     return ClassificationResult(predicted_label=predicted, margin=float(margin), best_score=best_score)
+
+
+# Texts without a single token (e.g. "?!", "x", emoji-only) skip the batcher.
+TOKEN_RE = re.compile(HASHING.token_pattern)
+NO_TOKENS_RESULT = svm_result(np.asarray(svm_intercept, dtype=np.float32))
+
+
+def classify_many(texts: List[str]) -> List[ClassificationResult]:
+    """
+    Classify non-empty cleaned texts (uncached, blocking) with one rule pass
+    and one svm_scores() call for the texts the rules don't settle.
+    """
+    results: List[Optional[ClassificationResult]] = [
+        None if label is None else rule_result(label) for label in rule_based_label_batch(texts)
+    ]
+
+    svm_rows = [j for j, result in enumerate(results) if result is None]
+    if svm_rows:
+        scores = svm_scores([texts[j] for j in svm_rows])
+        for j, row in zip(svm_rows, scores):
+            results[j] = svm_result(row)
+
+    return results
+
+
+if __name__ == "__main__":
+    # Importing the module trains and caches the model; report where it went.
+    print(MODEL_FILE)
@@ -0,0 +1,69 @@
+import unittest
+
+import numpy as np
+from fastapi.testclient import TestClient
+from sklearn.preprocessing import normalize
+
+import main
+
+
+class ClassifyWithoutLifespanTest(unittest.TestCase):
+    def test_svm_path_without_lifespan(self):
+        # no `with`: the lifespan (and so the DynBatcher worker) never starts
+        client = TestClient(main.app)
+        text = "hello world"
+        self.assertIsNone(main.rule_based_label(text))
+
+        response = client.post("/classify", json={"text": text})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(response.json()["predicted_label"], main.ALL_LABELS)
+
+
+PARITY_TEXTS = [
+    "please add tests for this",
+    "the loop never terminates when the input is huge",
+    "rename this variable and fix the whitespace",
+    "Why did you choose this approach? It breaks the CI build on windows",
+    "hello world",
+    "x",
+]
+
+
+class ScoringParityTest(unittest.TestCase):
+    def test_direct_hashing_matches_hashing_vectorizer(self):
+        for text in PARITY_TEXTS:
+            X = main.HASHING.transform([text])
+            data, indices, indptr = main.hashed_counts([text])
+            np.testing.assert_array_equal(data, X.data)
+            np.testing.assert_array_equal(indices, X.indices)
+            np.testing.assert_array_equal(indptr, X.indptr)
+
+    def test_svm_scores_match_sklearn_pipeline(self):
+        # reference: sklearn sparse tf-idf + L2 norm on the kept features,
+        # scored with the dequantized int8 weights
+        X = main.HASHING.transform(PARITY_TEXTS)[:, main.model_features].tocsr()
+        X.data = (np.log(X.data) + 1.0) * main.feature_idf[X.indices]
+        X = normalize(X)
+        coef = main.coef_i8.astype(np.float32) * main.coef_scales
+        expected = X @ coef + main.svm_intercept
+
+        np.testing.assert_allclose(main.svm_scores(PARITY_TEXTS), expected, atol=1e-5)
+        for i, text in enumerate(PARITY_TEXTS):
+            np.testing.assert_allclose(main.svm_scores([text])[0], expected[i], atol=1e-5)
+
+    def test_svm_scores_match_decision_function(self):
+        hashing, features, feature_idf, clf = main.train_model()
+        np.testing.assert_array_equal(features, main.model_features)
+        X = hashing.transform(PARITY_TEXTS)[:, features].tocsr()
+        X.data = (np.log(X.data) + 1.0) * feature_idf[X.indices]
+        X = normalize(X)
+
+        # int8 rounding moves each weight by at most half a quantization step;
+        # retraining itself can shift liblinear's solution by ~1e-5
+        tolerance = 0.5 * np.abs(X).sum(axis=1).A * main.coef_scales + 1e-4
+        diff = np.abs(main.svm_scores(PARITY_TEXTS) - clf.decision_function(X))
+        self.assertTrue((diff <= tolerance).all())
+
+
+if __name__ == "__main__":
+    unittest.main()